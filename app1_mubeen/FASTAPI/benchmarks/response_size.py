@@ -0,0 +1,97 @@
+"""
+Benchmark of transaction list response size and compression cost.
+
+Builds /transactions responses of realistic transactions at several page sizes,
+with all fields and with the fields= projection the React table needs, and
+reports bytes on the wire and compression CPU time for each encoding.
+
+Usage:
+    python benchmarks/response_size.py
+    python benchmarks/response_size.py --sizes 9 100 1000 --repeat 50
+
+    Brotli is measured when the brotli package is installed.
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CATEGORIES = ["Groceries", "Rent", "Salary", "Utilities", "Transport", "Dining", "Health", "Entertainment"]
+WORDS = ["weekly", "monthly", "shop", "card", "payment", "online", "store", "bill", "transfer", "refund"]
+# what readTransaction.jsx renders
+TABLE_FIELDS = ["table_name_id", "amount", "category", "description", "is_income", "date"]
+
+
+def make_transaction(owner_id: str) -> dict:
+    """
+    Build one transaction shaped like schemas.Transaction.
+    """
+    return {
+        "amount": round(random.uniform(1, 2500), 2),
+        "category": random.choice(CATEGORIES),
+        "description": " ".join(random.choices(WORDS, k=random.randint(2, 5))),
+        "is_income": random.random() < 0.2,
+        "date": (date(2024, 1, 1) + timedelta(days=random.randint(0, 365))).isoformat(),
+        "table_name_id": str(uuid.uuid4()),
+        "owner_id": owner_id,
+    }
+
+
+def make_body(size: int, fields: list = None) -> bytes:
+    """
+    Serialize a TransactionsResponse page the way FastAPI does.
+    """
+    owner_id = str(uuid.uuid4())
+    rows = [make_transaction(owner_id) for _ in range(size)]
+    if fields:
+        rows = [{name: row[name] for name in fields} for row in rows]
+    body = {"transactions": rows, "total_amount": sum(row.get("amount", 0) for row in rows),
+            "total": size, "page": 1, "size": size, "pages": 1}
+    return json.dumps(body, separators=(",", ":")).encode()
+
+
+def measure(compress, body: bytes, repeat: int) -> tuple:
+    """
+    Return the compressed size and the mean compression time in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        compressed = compress(body)
+    return len(compressed), (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure transaction response size and compression cost")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    random.seed(0)
+
+    encoders = {
+        "gzip-6": lambda body: gzip.compress(body, compresslevel=6),
+        "gzip-9": lambda body: gzip.compress(body, compresslevel=9),
+    }
+    if brotli is not None:
+        encoders["br-4"] = lambda body: brotli.compress(body, quality=4)
+        encoders["br-11"] = lambda body: brotli.compress(body, quality=11)
+
+    print(f"{'page':>6} {'fields':>7} {'encoding':>9} {'bytes':>9} {'ratio':>6} {'cpu us':>9}")
+    for size in args.sizes:
+        for label, fields in (("all", None), ("table", TABLE_FIELDS)):
+            body = make_body(size, fields)
+            print(f"{size:>6} {label:>7} {'identity':>9} {len(body):>9} {1:>6.2f} {0:>9.0f}")
+            for name, compress in encoders.items():
+                compressed, cpu = measure(compress, body, args.repeat)
+                print(f"{size:>6} {label:>7} {name:>9} {compressed:>9} {len(body) / compressed:>6.2f} {cpu:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Module defining the /jobs routes for background work.
+Jobs are queued on the primary database and run by worker.py, the handlers
+only enqueue and report status so they never hold a web worker.
+"""
+import schemas.job_schema as schemas
+import services.job_service as job_service
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from pydantic import UUID4
+from models.database import get_db
+from utils.config import get_logger
+from schemas.user_schema import User
+from utils.security import get_current_user
+
+logger = get_logger()
+
+router = APIRouter()
+
+
+@router.post("/jobs", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    job: schemas.JobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> schemas.Job:
+    """
+    Queue a background job for the current user.
+    """
+    logger.info(f"Queueing job {job.kind} for user: {current_user.id}")
+    return job_service.enqueue_job(job, current_user.id, db)
+
+
+@router.get("/jobs", response_model=list[schemas.Job])
+def read_jobs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> list[schemas.Job]:
+    """
+    List the current user's jobs, newest first.
+    """
+    return job_service.list_jobs(current_user.id, db)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.Job)
+def read_job(job_id: UUID4, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> schemas.Job:
+    """
+    Retrieve the status, progress and result of a job.
+
+    Args:
+        job_id (UUID4): The ID of the job.
+        db (Session): Session on the primary database.
+
+    Returns:
+        schemas.Job: The job with the specified ID.
+    """
+    return job_service.fetch_job(job_id, current_user.id, db)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=schemas.Job)
+def cancel_job(job_id: UUID4, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> schemas.Job:
+    """
+    Cancel a queued or running job.
+
+    Args:
+        job_id (UUID4): The ID of the job to cancel.
+        db (Session): Session on the primary database.
+
+    Returns:
+        schemas.Job: The cancelled job.
+    """
+    logger.info(f"Cancelling job with ID: {job_id}")
+    return job_service.cancel_job(job_id, current_user.id, db)
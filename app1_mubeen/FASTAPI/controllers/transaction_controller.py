@@ -6,11 +6,12 @@ importing sql alchemy for database
 from typing import Optional
 import schemas.transaction_schema as schemas
 import services.transaction_service as transaction_service
-from fastapi import APIRouter, Depends
+import services.suggest_service as suggest_service
+from fastapi import APIRouter, Depends, Query
 from fastapi_pagination import Page, add_pagination
 from sqlalchemy.orm import Session
 from pydantic import UUID4
-from models.database import get_db
+from models.sharding import get_shard_db
 from utils.config import get_logger  # Import the logger
 from schemas.user_schema import User
 from utils.security import get_current_user
@@ -24,7 +25,7 @@ router = APIRouter()
 @router.post("/transactions", response_model=schemas.Transaction)
 async def create_transaction(
     transaction: schemas.TransactionCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     current_user: User = Depends(get_current_user)
 ) -> schemas.Transaction:
     """
@@ -35,12 +36,14 @@ async def create_transaction(
     logger.info(f"Transaction created successfully with ID: {created_transaction.table_name_id}")
     return created_transaction
 
-@router.get("/transactions", response_model=schemas.TransactionsResponse)
+@router.get("/transactions", response_model=schemas.TransactionsResponse,
+            response_model_exclude_unset=True)
 async def read_transactions(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     search: Optional[str] = None,
     page: int = 1,
     size: int = 9,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ) -> schemas.TransactionsResponse:
     """
@@ -51,35 +54,66 @@ async def read_transactions(
         db (Session): The database session.
         page (int): The current page number.
         size (int): The number of items per page.
+        fields (Optional[str]): Comma separated transaction fields to return, all when omitted.
 
     Returns:
         dict: A dictionary with a list of filtered transactions and their total sum.
     """
     logger.info("Fetching filtered transactions and their total amount from the database")
-    result = transaction_service.get_filtered_transactions_with_sum(db, search, page, size, user_id=current_user.id )
+    selected = transaction_service.parse_fields(fields)
+    result = transaction_service.get_filtered_transactions_with_sum(db, search, page, size, user_id=current_user.id,
+                                                                    fields=selected)
     logger.info("Retrieved filtered transactions and their total amount from the database")
     return result
 
-@router.get("/transactions/{transaction_id}", response_model=schemas.Transaction)
-def read_transaction(transaction_id: UUID4, db: Session = Depends(get_db), current_user: User = Depends(get_current_user))-> schemas.Transaction:
+@router.get("/transactions/suggest", response_model=schemas.SuggestResponse)
+def suggest_transactions(
+    prefix: str = Query(min_length=1),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: Session = Depends(get_shard_db),
+    current_user: User = Depends(get_current_user)
+) -> schemas.SuggestResponse:
+    """
+    Suggest categories and description words for type-ahead.
+
+    Served from an in-memory per-user index, the transactions table is only
+    read the first time a user's index is built.
+
+    Args:
+        prefix (str): What the user has typed so far.
+        limit (int): Maximum number of suggestions of each kind.
+        db (Session): The database session.
+
+    Returns:
+        schemas.SuggestResponse: Matching categories and description words.
+    """
+    return suggest_service.suggest(current_user.id, prefix, db, limit)
+
+@router.get("/transactions/{transaction_id}", response_model=schemas.PartialTransaction,
+            response_model_exclude_unset=True)
+def read_transaction(transaction_id: UUID4, fields: Optional[str] = None, db: Session = Depends(get_shard_db),
+                     current_user: User = Depends(get_current_user))-> schemas.PartialTransaction:
     """
     Retrieve a specific transaction by its ID.
 
     Args:
         transaction_id (UUID4): The ID of the transaction to retrieve.
+        fields (Optional[str]): Comma separated transaction fields to return, all when omitted.
         db (Session): The database session.
 
     Returns:
-        schemas.Transaction: The transaction with the specified ID.
+        schemas.PartialTransaction: The transaction with the specified ID.
     """
     logger.info(f"Fetching transaction with ID: {transaction_id}")
-    transaction = transaction_service.get_transaction_by_id(transaction_id, db)
+    selected = transaction_service.parse_fields(fields)
+    transaction = transaction_service.get_transaction_by_id(transaction_id, db, current_user.id, selected)
     logger.info(f"Transaction retrieved successfully with ID: {transaction_id}")
     return transaction
 
 @router.put("/transactions/{transaction_id}", response_model=schemas.Transaction)
 def update_transaction(transaction_id: UUID4,
-        transaction: schemas.TransactionBase, db: Session = Depends(get_db))-> schemas.Transaction:
+        transaction: schemas.TransactionBase, db: Session = Depends(get_shard_db),
+        current_user: User = Depends(get_current_user))-> schemas.Transaction:
     """
     Update an existing transaction by its ID.
 
@@ -92,12 +126,13 @@ def update_transaction(transaction_id: UUID4,
         schemas.Transaction: The updated transaction.
     """
     logger.info(f"Updating transaction with ID: {transaction_id} with data: {transaction}")
-    updated_transaction = transaction_service.update_transaction(transaction_id, transaction, db)
+    updated_transaction = transaction_service.update_transaction(transaction_id, transaction, db, current_user.id)
     logger.info(f"Transaction updated successfully with ID: {transaction_id}")
     return updated_transaction
 
 @router.delete("/transactions/{transaction_id}")
-def delete_transaction(transaction_id: UUID4, db: Session = Depends(get_db))-> None:
+def delete_transaction(transaction_id: UUID4, db: Session = Depends(get_shard_db),
+        current_user: User = Depends(get_current_user))-> None:
     """
     Delete a transaction by its ID.
 
@@ -109,7 +144,7 @@ def delete_transaction(transaction_id: UUID4, db: Session = Depends(get_db))-> N
         None
     """
     logger.info(f"Deleting transaction with ID: {transaction_id}")
-    transaction_service.delete_transaction(transaction_id, db)
+    transaction_service.delete_transaction(transaction_id, db, current_user.id)
     logger.info(f"Transaction deleted successfully with ID: {transaction_id}")
 
 add_pagination(router)
\ No newline at end of file
@@ -8,6 +8,7 @@ Imports:
     FastAPI: The FastAPI framework for creating the application instance.
     CORSMiddleware: Middleware for handling Cross-Origin Resource Sharing (CORS).
     transaction_controller: Module that contains transaction-related routes.
+    job_controller: Module that contains routes for queueing and tracking background jobs.
 
 Usage:
     This module should be run to start the FastAPI application server.
@@ -15,10 +16,16 @@ Usage:
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from controllers import transaction_controller, user_controller
+from fastapi.middleware.gzip import GZipMiddleware
+from controllers import transaction_controller, user_controller, job_controller
 from utils.config import get_logger
 from models.database import engine, Base
+from models.sharding import shard_map
 from mangum import Mangum
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 app = FastAPI()
 # Initialize logger
 logger = get_logger()
@@ -38,12 +45,26 @@ app.add_middleware(
     allow_headers=['*']
 )
 
+#responses smaller than this are sent uncompressed, a single transaction is ~220 bytes of JSON
+COMPRESSION_MINIMUM_SIZE = 1000
+#brotli when the client accepts it and brotli-asgi is installed, gzip otherwise
+#levels picked with benchmarks/response_size.py: on a 1000 row page br-4 is as small as gzip-9
+#at a third of its CPU, br-11 saves another 17% but takes ~0.5 s per response
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=COMPRESSION_MINIMUM_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, compresslevel=6)
+
 app.include_router(user_controller.router)
 app.include_router(transaction_controller.router)
+app.include_router(job_controller.router)
 #for deploying fastapi on serverless architecture like vercel
 handler = Mangum(app)
 # Base.metadata.drop_all(bind=engine)
 Base.metadata.create_all(bind=engine)
+#every shard gets the full schema, only the primary database holds users and shard pins
+for shard_engine in shard_map.engines:
+    Base.metadata.create_all(bind=shard_engine)
 
 @app.on_event("startup")
 async def startup_event():
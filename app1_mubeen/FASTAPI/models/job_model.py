@@ -0,0 +1,44 @@
+"""
+Module for the background job queue table.
+
+Imports:
+    - uuid: Provides UUID generation for job ids.
+    - datetime: Used for the created and updated timestamps.
+    - String, Column, Integer, Float, DateTime, JSON: SQLAlchemy data types.
+    - UUID: PostgreSQL-specific UUID data type from SQLAlchemy dialects.
+    - Base: SQLAlchemy Base class for declarative base.
+    - JobStatus: Enumeration of job states.
+
+Usage:
+    The jobs table lives on the primary database and is the queue. Web handlers
+    insert queued rows and worker.py claims them and runs them on a process pool.
+"""
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Column, Integer, Float, DateTime, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from .database import Base
+from utils.constants import JobStatus
+
+
+class Job(Base):
+    """
+    SQLAlchemy model for background jobs.
+    """
+    __tablename__ = "jobs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_id = Column(UUID(as_uuid=True), index=True, nullable=False)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, index=True, default=JobStatus.QUEUED.value)
+    progress = Column(Float, nullable=False, default=0.0)
+    result = Column(JSON)
+    error = Column(String)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # refreshed by the worker running the job, a stale heartbeat means the worker died
+    heartbeat_at = Column(DateTime)
+    # queued jobs are not claimed before this time, used to back off retries
+    run_after = Column(DateTime)
@@ -0,0 +1,27 @@
+"""
+Module for the shard directory table.
+
+Imports:
+    - Column, Integer: SQLAlchemy data types for defining table columns.
+    - UUID: PostgreSQL-specific UUID data type from SQLAlchemy dialects.
+    - Base: SQLAlchemy Base class for declarative base.
+
+Usage:
+    The shard_pins table lives on the primary database. A row pins an owner to a
+    shard and takes precedence over the consistent hash ring, which is how users
+    are kept routable while their rows are being moved between shards. While
+    moving is set the owner's transactions are read only.
+"""
+from sqlalchemy import Column, Integer, Boolean
+from sqlalchemy.dialects.postgresql import UUID
+from .database import Base
+
+
+class ShardPin(Base):
+    """
+    SQLAlchemy model for a user's pinned shard.
+    """
+    __tablename__ = "shard_pins"
+    owner_id = Column(UUID(as_uuid=True), primary_key=True)
+    shard = Column(Integer, nullable=False)
+    moving = Column(Boolean, nullable=False, default=False)
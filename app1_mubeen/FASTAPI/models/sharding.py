@@ -0,0 +1,135 @@
+"""
+Module for routing transactions to database shards by owner_id.
+
+Imports:
+    - hashlib, bisect: Used to build and search the consistent hash ring.
+    - sessionmaker, Session: SQLAlchemy session factory and session type.
+    - config: Application configuration holding the shard engines.
+    - get_db: Session on the primary database, where users and pins live.
+    - get_current_user: Dependency returning the authenticated user.
+
+Usage:
+    Use get_shard_db as a dependency in transaction endpoints. It yields a session
+    bound to the shard that holds the current user's transactions.
+
+    Shards are identified by their position in SHARD_DATABASE_URLS. New shards
+    must be appended to the end of the list so that existing ring positions stay
+    where they are and only a fraction of users need to be rebalanced.
+"""
+import bisect
+import hashlib
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, status
+from pydantic import UUID4
+from sqlalchemy.orm import Session, sessionmaker
+from utils.config import config
+from utils.security import get_current_user
+from models.database import get_db
+from models.shard_model import ShardPin
+from models.user_model import User
+from utils.constants import ErrorMessages
+
+# virtual nodes per shard, spreads owners evenly over a small number of shards
+REPLICAS = 100
+# seconds a client should wait before retrying a write to an owner being moved
+MOVING_RETRY_AFTER = 5
+
+
+class ShardMoving(Exception):
+    """
+    Raised when a write session is requested for an owner whose rows are being moved.
+    """
+
+
+class ShardMap:
+    """
+    Consistent hash ring mapping owner ids to shard engines.
+    """
+
+    def __init__(self, engines: list, replicas: int = REPLICAS):
+        self.engines = engines
+        self.sessions = [sessionmaker(bind=engine) for engine in engines]
+        ring = sorted(
+            (self._hash(f"shard-{index}-{replica}"), index)
+            for index in range(len(engines))
+            for replica in range(replicas)
+        )
+        self._keys = [key for key, _ in ring]
+        self._shards = [index for _, index in ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int(hashlib.md5(key.encode()).hexdigest()[:16], 16)
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def ring_shard(self, owner_id: UUID4) -> int:
+        """
+        Return the shard the hash ring assigns to an owner, ignoring pins.
+        """
+        position = bisect.bisect(self._keys, self._hash(str(owner_id))) % len(self._keys)
+        return self._shards[position]
+
+    def get_pin(self, owner_id: UUID4, directory: Session) -> Optional[int]:
+        """
+        Return the shard an owner is pinned to, or None when not pinned.
+        """
+        pin = directory.get(ShardPin, owner_id)
+        return pin.shard if pin else None
+
+    def shard_for(self, owner_id: UUID4, directory: Session) -> int:
+        """
+        Return the shard currently holding an owner's transactions.
+
+        Args:
+            owner_id (UUID4): The owner of the transactions.
+            directory (Session): Session on the primary database.
+
+        Returns:
+            int: Index of the shard, pins take precedence over the ring.
+        """
+        pinned = self.get_pin(owner_id, directory)
+        return pinned if pinned is not None else self.ring_shard(owner_id)
+
+    def session_for(self, owner_id: UUID4, directory: Session, write: bool = False) -> Session:
+        """
+        Open a session on the shard holding an owner's transactions.
+
+        Raises:
+            ShardMoving: Raised for write sessions while the owner is being moved.
+        """
+        pin = directory.get(ShardPin, owner_id)
+        if pin and pin.moving and write:
+            raise ShardMoving(owner_id)
+        return self.sessions[pin.shard if pin else self.ring_shard(owner_id)]()
+
+
+shard_map = ShardMap(config.shard_engines)
+
+
+def get_shard_db(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    directory: Session = Depends(get_db)
+):
+    """
+    Provides a session on the shard that holds the current user's transactions.
+    Yields:
+        Session: A SQLAlchemy session bound to the user's shard.
+    Raises:
+        HTTPException: 503 for non GET requests while the user's rows are being moved.
+    Usage:
+        Use this function as a dependency in transaction endpoints instead of get_db.
+        The session is closed and returned to the shard's connection pool after usage.
+    """
+    try:
+        db = shard_map.session_for(current_user.id, directory, write=request.method != "GET")
+    except ShardMoving as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=ErrorMessages.SHARD_MOVING.value,
+                            headers={"Retry-After": str(MOVING_RETRY_AFTER)}) from e
+    try:
+        yield db
+    finally:
+        db.close()
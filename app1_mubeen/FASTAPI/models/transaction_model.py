@@ -14,7 +14,6 @@ import uuid
 from sqlalchemy import String, Column, Boolean, Float
 from sqlalchemy.dialects.postgresql import UUID
 from .database import Base
-from sqlalchemy import Column, ForeignKey
 from sqlalchemy.orm import relationship
 
 #base an instance of sql alchemy thats how it knows this is class for creating table
@@ -29,5 +28,7 @@ class Transaction(Base):
     description = Column(String)
     is_income = Column(Boolean)
     date = Column(String)
-    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
-    owner = relationship("User", back_populates="transactions")
\ No newline at end of file
+    # no foreign key, users live on the primary database and transactions on shards
+    owner_id = Column(UUID(as_uuid=True), index=True)
+    owner = relationship("User", back_populates="transactions",
+                         primaryjoin="User.id == foreign(Transaction.owner_id)")
\ No newline at end of file
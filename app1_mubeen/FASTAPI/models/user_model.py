@@ -11,4 +11,5 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
-    transactions = relationship("Transaction", back_populates="owner")
\ No newline at end of file
+    transactions = relationship("Transaction", back_populates="owner",
+                                primaryjoin="User.id == foreign(Transaction.owner_id)")
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Command line tool for moving users' transactions between database shards.
+
+Usage:
+    python rebalance.py pin-all            pin every user to the shard holding their rows
+    python rebalance.py rebalance          move users to their hash ring shard
+    python rebalance.py move OWNER SHARD   move one user to a given shard
+    python rebalance.py unblock OWNER SHARD
+                                           end a move that was killed part way,
+                                           routing the user to SHARD again
+
+    To add a shard, run pin-all with the current SHARD_DATABASE_URLS, append the
+    new database to SHARD_DATABASE_URLS, deploy, then run rebalance.
+"""
+import argparse
+import uuid
+from models.database import SessionLocal, Base
+from models.sharding import shard_map
+from services import shard_service
+from utils.config import get_logger
+
+logger = get_logger()
+
+
+def main() -> None:
+    """
+    Parse the command line and run the requested shard operation.
+    """
+    parser = argparse.ArgumentParser(description="Move transactions between database shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("pin-all", help="pin every user to the shard holding their rows")
+    commands.add_parser("rebalance", help="move users to their hash ring shard")
+    move = commands.add_parser("move", help="move one user to a given shard")
+    move.add_argument("owner_id", type=uuid.UUID)
+    move.add_argument("shard", type=int, choices=range(len(shard_map)))
+    unblock = commands.add_parser("unblock", help="end a move that was killed part way")
+    unblock.add_argument("owner_id", type=uuid.UUID)
+    unblock.add_argument("shard", type=int, choices=range(len(shard_map)),
+                         help="the shard holding all of the user's rows")
+    args = parser.parse_args()
+
+    for engine in shard_map.engines:
+        Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as directory:
+        if args.command == "pin-all":
+            logger.info(f"Pinned {shard_service.pin_current_locations(directory)} users")
+        elif args.command == "rebalance":
+            logger.info(f"Moved {shard_service.rebalance(directory)} users")
+        elif args.command == "unblock":
+            shard_service.set_pin(args.owner_id, args.shard, directory)
+            logger.info(f"Owner {args.owner_id} routed to shard {args.shard}, writes unblocked")
+        else:
+            try:
+                shard_service.move_user(args.owner_id, args.shard, directory)
+            except shard_service.MoveBlocked as e:
+                logger.error(f"Move not started: {e}")
+
+
+if __name__ == "__main__":
+    main()
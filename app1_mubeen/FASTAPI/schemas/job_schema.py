@@ -0,0 +1,68 @@
+"""
+Module for background job schemas.
+
+Imports BaseModel, Field and UUID4 from Pydantic for defining request and
+response models of the /jobs endpoints, and the payload model of each job kind.
+"""
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel, ConfigDict, Field, UUID4
+from schemas.transaction_schema import TransactionCreate
+
+
+class SearchPayload(BaseModel):
+    """
+    Payload of summary and export jobs.
+    """
+    model_config = ConfigDict(extra="forbid")
+    search: Optional[str] = None
+
+
+class ImportPayload(BaseModel):
+    """
+    Payload of import jobs.
+    """
+    model_config = ConfigDict(extra="forbid")
+    transactions: list[TransactionCreate] = Field(min_length=1)
+
+
+class RecategorizePayload(BaseModel):
+    """
+    Payload of recategorize jobs.
+    """
+    model_config = ConfigDict(extra="forbid")
+    category: str
+    new_category: str
+
+
+class JobCreate(BaseModel):
+    """
+    Request body for enqueueing a job.
+
+    Attributes:
+        kind (str): Name of the job, one of the kinds registered in job_service.
+        payload (dict): Arguments for the job.
+        max_attempts (int): How many times the job is tried before it is marked failed.
+    """
+    kind: str
+    payload: dict = {}
+    max_attempts: int = Field(default=3, ge=1, le=10)
+
+
+class Job(BaseModel):
+    """
+    Job status, progress and result as returned to the client.
+    """
+    id: UUID4
+    kind: str
+    status: str
+    progress: float
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -11,6 +11,7 @@ Example:
     from pydantic import BaseModel, UUID4
 
 """
+from typing import Optional
 from pydantic import BaseModel, UUID4
 
 class TransactionBase(BaseModel):
@@ -59,13 +60,38 @@ class Transaction(TransactionBase):
         """
         from_attributes = True
 
+class PartialTransaction(BaseModel):
+    """
+    Transaction with only the fields requested through the fields= parameter.
+
+    Routes returning it set response_model_exclude_unset, so fields that were
+    not selected are left out of the response instead of being sent as null.
+    Without fields= every attribute is set and the output matches Transaction.
+    """
+    table_name_id: Optional[UUID4] = None
+    amount: Optional[float] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    is_income: Optional[bool] = None
+    date: Optional[str] = None
+    owner_id: Optional[UUID4] = None
+    class Config:
+        from_attributes = True
+
 class TransactionsResponse(BaseModel):
     """
     for total amount
     """
-    transactions: list[Transaction]
+    transactions: list[PartialTransaction]
     total_amount: float
     total: int #total no of pages
     page: int  #current page of table
     size: int
-    pages: int
\ No newline at end of file
+    pages: int
+
+class SuggestResponse(BaseModel):
+    """
+    autocomplete suggestions, most frequent first
+    """
+    categories: list[str]
+    descriptions: list[str]
@@ -0,0 +1,361 @@
+"""
+Module for the background job queue.
+
+Imports:
+    - Session: SQLAlchemy session for database operations.
+    - HTTPException, status: FastAPI error handling for the /jobs endpoints.
+    - UUID4: Pydantic type for UUID version 4.
+    - job_model, transaction_model: SQLAlchemy models of the jobs and transactions tables.
+    - transaction_service: The transaction operations that jobs are built from.
+    - shard_map: Routes a job's owner to the shard holding their transactions.
+
+Usage:
+    Handlers call enqueue_job and return immediately. worker.py calls claim_job
+    to take queued jobs and runs run_job for each of them on a process pool.
+    A job is a function registered in JOB_KINDS that takes the payload, the
+    owner id, a session on the owner's shard, a report callback and a check
+    callback, and returns a JSON serializable result. Both callbacks raise
+    JobCancelled once the attempt no longer holds the job, jobs call check right
+    before committing so an attempt whose lease was taken over writes nothing.
+"""
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+import schemas.job_schema as job_schemas
+import schemas.transaction_schema as schemas
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from pydantic import UUID4, ValidationError
+from fastapi.encoders import jsonable_encoder
+from models import job_model, transaction_model
+from models.database import SessionLocal
+from models.sharding import shard_map, ShardMoving, MOVING_RETRY_AFTER
+from services import transaction_service
+from utils.constants import ErrorMessages, JobStatus
+from utils.config import get_logger
+
+logger = get_logger()
+
+# export progress is reported after every this many rows
+EXPORT_BATCH_SIZE = 100
+# a running job's heartbeat is refreshed this often, and the job is handed to
+# another worker when it has not been refreshed for LEASE_SECONDS
+HEARTBEAT_SECONDS = 10
+LEASE_SECONDS = 60
+# delay before the first retry, doubled for every further attempt
+RETRY_BACKOFF_SECONDS = 10
+
+
+class JobCancelled(Exception):
+    """
+    Raised from a job's report or check callback once the attempt no longer
+    holds the job, because it was cancelled or its lease expired and another
+    attempt claimed it.
+    """
+
+
+def summary_job(payload: job_schemas.SearchPayload, owner_id: UUID4, db: Session, report: Callable,
+                check: Callable) -> dict:
+    """
+    Recompute the total amount and count over the owner's full history.
+    """
+    result = transaction_service.get_filtered_transactions_with_sum(
+        db, payload.search, 1, 1, user_id=owner_id)
+    return {"total_amount": result["total_amount"], "total": result["total"]}
+
+
+def import_job(payload: job_schemas.ImportPayload, owner_id: UUID4, db: Session, report: Callable,
+               check: Callable) -> dict:
+    """
+    Create every transaction listed in the payload, all or nothing.
+    """
+    return {"imported": transaction_service.create_transactions(
+        payload.transactions, owner_id, db, report, before_commit=check)}
+
+
+def export_job(payload: job_schemas.SearchPayload, owner_id: UUID4, db: Session, report: Callable,
+               check: Callable) -> dict:
+    """
+    Serialize all of the owner's transactions matching the payload's search term.
+
+    The rows are read by one ordered query, so the export and its total come
+    from a single snapshot even while the owner keeps writing.
+    """
+    rows = transaction_service.filter_transactions(
+        db.query(transaction_model.Transaction), payload.search, owner_id).order_by(
+        transaction_model.Transaction.table_name_id).all()
+    exported = []
+    total_amount = 0
+    for done, row in enumerate(rows, start=1):
+        exported.append(schemas.Transaction.model_validate(row).model_dump(mode="json"))
+        total_amount += row.amount
+        if done % EXPORT_BATCH_SIZE == 0:
+            report(done / len(rows))
+    return {"transactions": exported, "total_amount": total_amount}
+
+
+def recategorize_job(payload: job_schemas.RecategorizePayload, owner_id: UUID4, db: Session,
+                     report: Callable, check: Callable) -> dict:
+    """
+    Move every transaction in the payload's category to its new_category, all or nothing.
+    """
+    return {"updated": transaction_service.recategorize_transactions(
+        owner_id, payload.category, payload.new_category, db, before_commit=check)}
+
+
+#kind -> (job function, payload model)
+JOB_KINDS = {
+    "summary": (summary_job, job_schemas.SearchPayload),
+    "import": (import_job, job_schemas.ImportPayload),
+    "export": (export_job, job_schemas.SearchPayload),
+    "recategorize": (recategorize_job, job_schemas.RecategorizePayload),
+}
+
+
+def is_permanent(error: Exception) -> bool:
+    """
+    Return True for errors that would happen again on retry, such as bad input.
+    """
+    if isinstance(error, ValidationError):
+        return True
+    return isinstance(error, HTTPException) and error.status_code < 500
+
+
+def fetch_job(job_id: UUID4, owner_id: UUID4, db: Session) -> job_model.Job:
+    """
+    Fetch one of the owner's jobs by its ID.
+
+    Raises:
+        HTTPException: Raised with status code 404 if the job is not found.
+    """
+    db_job = db.query(job_model.Job).filter(
+        job_model.Job.id == job_id, job_model.Job.owner_id == owner_id).first()
+    if not db_job:
+        logger.error(f"Job with ID: {job_id} not found")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=ErrorMessages.JOB_NOT_FOUND.value)
+    return db_job
+
+
+def enqueue_job(job: job_schemas.JobCreate, owner_id: UUID4, db: Session) -> job_model.Job:
+    """
+    Add a job to the queue.
+
+    Args:
+        job (job_schemas.JobCreate): Kind, payload and retry limit of the job.
+        owner_id (UUID4): The user the job runs for.
+        db (Session): Session on the primary database.
+
+    Returns:
+        job_model.Job: The queued job.
+
+    Raises:
+        HTTPException: Raised with status code 400 if the job kind is unknown
+        or the payload does not match the kind.
+    """
+    if job.kind not in JOB_KINDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=ErrorMessages.UNKNOWN_JOB_KIND.value)
+    _, payload_model = JOB_KINDS[job.kind]
+    try:
+        payload = payload_model.model_validate(job.payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+            "message": ErrorMessages.INVALID_JOB_PAYLOAD.value,
+            "errors": jsonable_encoder(e.errors(include_url=False, include_context=False)),
+        }) from e
+    try:
+        db_job = job_model.Job(owner_id=owner_id, kind=job.kind, max_attempts=job.max_attempts,
+                               payload=payload.model_dump(mode="json"))
+        db.add(db_job)
+        db.commit()
+        db.refresh(db_job)
+        logger.info(f"Job {db_job.kind} queued with ID: {db_job.id}")
+        return db_job
+    except Exception as e:
+        logger.error(f"Error enqueueing job: {e}")
+        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_ENQUEUEING_JOB.value) from e
+
+
+def list_jobs(owner_id: UUID4, db: Session) -> list:
+    """
+    Return the owner's jobs, newest first.
+    """
+    return db.query(job_model.Job).filter(job_model.Job.owner_id == owner_id).order_by(
+        job_model.Job.created_at.desc()).all()
+
+
+def cancel_job(job_id: UUID4, owner_id: UUID4, db: Session) -> job_model.Job:
+    """
+    Cancel a queued or running job.
+
+    A running job stops the next time it reports progress.
+
+    Raises:
+        HTTPException: Raised with status code 409 if the job has already finished.
+    """
+    db_job = fetch_job(job_id, owner_id, db)
+    if db_job.status not in (JobStatus.QUEUED.value, JobStatus.RUNNING.value):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=ErrorMessages.JOB_NOT_CANCELLABLE.value)
+    db_job.status = JobStatus.CANCELLED.value
+    db.commit()
+    db.refresh(db_job)
+    logger.info(f"Job cancelled with ID: {job_id}")
+    return db_job
+
+
+def claim_job(db: Session) -> Optional[tuple[UUID4, int]]:
+    """
+    Mark the oldest queued job as running and return its ID and attempt number.
+
+    Rows locked by another worker are skipped, so several workers can share the
+    queue on PostgreSQL. The attempt number is the lease, the job belongs to
+    this attempt only for as long as the job's attempts still equal it.
+
+    Returns:
+        Optional[tuple[UUID4, int]]: The claimed job's ID and attempt, or None when the queue is empty.
+    """
+    now = datetime.utcnow()
+    db_job = db.query(job_model.Job).filter(
+        job_model.Job.status == JobStatus.QUEUED.value,
+        (job_model.Job.run_after.is_(None)) | (job_model.Job.run_after <= now)).order_by(
+        job_model.Job.created_at).with_for_update(skip_locked=True).first()
+    if not db_job:
+        db.rollback()
+        return None
+    db_job.status = JobStatus.RUNNING.value
+    db_job.attempts += 1
+    db_job.heartbeat_at = now
+    db.commit()
+    return db_job.id, db_job.attempts
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """
+    Hand running jobs whose worker stopped sending heartbeats back to the queue.
+
+    Jobs that have used up max_attempts are marked failed instead.
+
+    Returns:
+        int: The number of stale jobs found.
+    """
+    stale = db.query(job_model.Job).filter(
+        job_model.Job.status == JobStatus.RUNNING.value,
+        job_model.Job.heartbeat_at < datetime.utcnow() - timedelta(seconds=LEASE_SECONDS)).with_for_update(
+        skip_locked=True).all()
+    for db_job in stale:
+        retry = db_job.attempts < db_job.max_attempts
+        db_job.status = JobStatus.QUEUED.value if retry else JobStatus.FAILED.value
+        db_job.error = "Worker stopped while running the job"
+        logger.error(f"Job with ID: {db_job.id} lost its worker{', retrying' if retry else ''}")
+    db.commit()
+    return len(stale)
+
+
+def heartbeat(job_id: UUID4, attempt: int, stop: threading.Event) -> None:
+    """
+    Refresh a running job's heartbeat until stop is set, as long as the attempt holds the job.
+    """
+    while not stop.wait(HEARTBEAT_SECONDS):
+        try:
+            with SessionLocal() as db:
+                db.query(job_model.Job).filter(
+                    job_model.Job.id == job_id, job_model.Job.status == JobStatus.RUNNING.value,
+                    job_model.Job.attempts == attempt).update(
+                    {job_model.Job.heartbeat_at: datetime.utcnow()})
+                db.commit()
+        except Exception as e:
+            logger.error(f"Heartbeat failed for job with ID: {job_id}: {e}")
+
+
+def run_job(job_id: UUID4, attempt: int) -> None:
+    """
+    Run a claimed job to completion. Entry point for the worker processes.
+
+    A failing job goes back to the queue until it has used up max_attempts,
+    after which it is marked failed with the last error. Errors that would
+    repeat, such as invalid input, fail the job straight away. Retries are
+    delayed with an exponential backoff. Once the job is no longer running
+    as this attempt, the attempt stops and leaves the job alone.
+    """
+    stop = threading.Event()
+    threading.Thread(target=heartbeat, args=(job_id, attempt, stop), daemon=True).start()
+    try:
+        _run_job(job_id, attempt)
+    finally:
+        stop.set()
+
+
+def _run_job(job_id: UUID4, attempt: int) -> None:
+    """
+    Run a claimed job and record its outcome, see run_job.
+    """
+    with SessionLocal() as directory:
+        db_job = directory.get(job_model.Job, job_id)
+        reported = [0]
+
+        def holds_lease() -> bool:
+            directory.refresh(db_job)
+            return db_job.status == JobStatus.RUNNING.value and db_job.attempts == attempt
+
+        def check() -> None:
+            if not holds_lease():
+                raise JobCancelled()
+            # end the read, so the directory does not hold a lock over the job's commit
+            directory.commit()
+
+        def report(progress: float) -> None:
+            # only write whole percent steps, keeps the queue table quiet on big jobs
+            percent = int(progress * 100)
+            if percent == reported[0]:
+                return
+            reported[0] = percent
+            if not holds_lease():
+                raise JobCancelled()
+            db_job.progress = percent / 100
+            directory.commit()
+
+        if not holds_lease():
+            logger.info(f"Job with ID: {job_id} was taken over before attempt {attempt} started")
+            return
+        logger.info(f"Running job {db_job.kind} with ID: {job_id}, attempt {attempt}")
+        try:
+            db = shard_map.session_for(db_job.owner_id, directory, write=True)
+        except ShardMoving:
+            # the owner's rows are being moved between shards, this attempt does not count
+            logger.info(f"Job with ID: {job_id} put back, owner's transactions are being moved")
+            db_job.status = JobStatus.QUEUED.value
+            db_job.attempts -= 1
+            db_job.run_after = datetime.utcnow() + timedelta(seconds=MOVING_RETRY_AFTER)
+            directory.commit()
+            return
+        try:
+            job_function, payload_model = JOB_KINDS[db_job.kind]
+            payload = payload_model.model_validate(db_job.payload)
+            result = job_function(payload, db_job.owner_id, db, report, check)
+            if not holds_lease():
+                raise JobCancelled()
+            db_job.result = result
+            db_job.error = None
+            db_job.progress = 1.0
+            db_job.status = JobStatus.SUCCEEDED.value
+            logger.info(f"Job succeeded with ID: {job_id}")
+        except JobCancelled:
+            db.rollback()
+            logger.info(f"Job stopped with ID: {job_id}, status is now {db_job.status}")
+        except Exception as e:
+            db.rollback()
+            # a failed progress write leaves the directory session needing a rollback too
+            directory.rollback()
+            if holds_lease():
+                db_job.error = str(e.detail if isinstance(e, HTTPException) else e)
+                retry = db_job.attempts < db_job.max_attempts and not is_permanent(e)
+                db_job.status = JobStatus.QUEUED.value if retry else JobStatus.FAILED.value
+                if retry:
+                    db_job.run_after = datetime.utcnow() + timedelta(
+                        seconds=RETRY_BACKOFF_SECONDS * 2 ** (db_job.attempts - 1))
+                logger.error(f"Job with ID: {job_id} failed{', retrying' if retry else ''}: {e}")
+        finally:
+            db.close()
+        directory.commit()
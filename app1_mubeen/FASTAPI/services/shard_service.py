@@ -0,0 +1,204 @@
+"""
+Module for moving users' transactions between database shards.
+
+Imports:
+    - Session: SQLAlchemy session for database operations.
+    - select, delete: SQLAlchemy core constructs for bulk reads and deletes.
+    - UUID4: Pydantic type for UUID version 4.
+    - shard_map: The consistent hash ring routing owners to shards.
+    - ShardPin: Directory table pinning owners to shards.
+    - transaction_model: SQLAlchemy model of the transactions table.
+
+Usage:
+    A move is done online. The owner is pinned to the source shard and marked as
+    moving, which keeps reads working but rejects writes. After a grace period
+    for writes that were already in flight, rows are copied to the target, the
+    pin is flipped so requests go to the target, and the source rows are removed.
+    Used by the rebalance.py command line tool.
+"""
+import time
+from typing import Optional
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from pydantic import UUID4
+from models import job_model, transaction_model
+from models.shard_model import ShardPin
+from models.sharding import shard_map
+from utils.constants import JobStatus
+from utils.config import get_logger
+
+logger = get_logger()
+
+Transaction = transaction_model.Transaction
+
+# longer than a request takes, so writes that started before the owner was
+# marked as moving have committed before the copy starts
+MOVE_GRACE_SECONDS = 5
+
+
+class MoveBlocked(Exception):
+    """
+    Raised when an owner cannot be moved because a background job is writing for them.
+    """
+
+
+def set_pin(owner_id: UUID4, shard: Optional[int], directory: Session, moving: bool = False) -> None:
+    """
+    Pin an owner to a shard, or remove the pin when shard is None.
+
+    While moving is set, writes for the owner are rejected.
+    """
+    pin = directory.get(ShardPin, owner_id)
+    if shard is None:
+        if pin:
+            directory.delete(pin)
+    elif pin:
+        pin.shard = shard
+        pin.moving = moving
+    else:
+        directory.add(ShardPin(owner_id=owner_id, shard=shard, moving=moving))
+    directory.commit()
+
+
+def is_moving(owner_id: UUID4, directory: Session) -> bool:
+    """
+    Return True while another move of the owner is in progress.
+    """
+    pin = directory.get(ShardPin, owner_id)
+    return bool(pin and pin.moving)
+
+
+def copy_rows(owner_id: UUID4, source: Session, target: Session) -> int:
+    """
+    Replace an owner's transactions on the target shard with those on the source.
+
+    Only call this while the owner's writes are blocked. The target is not
+    routed to yet, so any rows it has for the owner are left over from an
+    aborted move and are removed first.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    rows = source.execute(
+        select(Transaction.__table__).where(Transaction.owner_id == owner_id)
+    ).mappings().all()
+    target.execute(delete(Transaction).where(Transaction.owner_id == owner_id))
+    target.add_all(Transaction(**row) for row in rows)
+    target.commit()
+    return len(rows)
+
+
+def owners_on_shard(shard: int) -> list:
+    """
+    Return the distinct owner ids that have transactions on a shard.
+    """
+    with shard_map.sessions[shard]() as db:
+        return [owner_id for (owner_id,) in db.query(Transaction.owner_id).distinct()]
+
+
+def move_user(owner_id: UUID4, target: int, directory: Session, source: Optional[int] = None,
+              grace: float = MOVE_GRACE_SECONDS) -> int:
+    """
+    Move an owner's transactions to another shard while the app keeps serving.
+
+    Reads keep working during the move, writes get a 503 until it is done.
+
+    Args:
+        owner_id (UUID4): The owner whose transactions are moved.
+        target (int): Index of the destination shard.
+        directory (Session): Session on the primary database.
+        source (Optional[int]): Shard holding the rows, defaults to the current route.
+        grace (float): Seconds to wait for in-flight writes before copying.
+
+    Returns:
+        int: The number of rows moved.
+
+    Raises:
+        MoveBlocked: Raised if a background job is running for the owner, or
+        the owner is already being moved.
+    """
+    if is_moving(owner_id, directory):
+        raise MoveBlocked(f"owner {owner_id} is already being moved")
+    if source is None:
+        source = shard_map.shard_for(owner_id, directory)
+    if source == target:
+        return 0
+    set_pin(owner_id, source, directory, moving=True)
+    # jobs claimed from now on cannot open a write session, earlier ones show up as running
+    running = directory.query(job_model.Job).filter(
+        job_model.Job.owner_id == owner_id, job_model.Job.status == JobStatus.RUNNING.value).count()
+    if running:
+        set_pin(owner_id, source, directory)
+        raise MoveBlocked(f"owner {owner_id} has {running} running jobs")
+    logger.info(f"Moving transactions of owner {owner_id} from shard {source} to shard {target}")
+    with shard_map.sessions[source]() as source_db, shard_map.sessions[target]() as target_db:
+        try:
+            time.sleep(grace)
+            moved = copy_rows(owner_id, source_db, target_db)
+        except BaseException:
+            # the source still has every row, unblock writes there
+            set_pin(owner_id, source, directory)
+            raise
+        set_pin(owner_id, target, directory)
+        source_db.execute(delete(Transaction).where(Transaction.owner_id == owner_id))
+        source_db.commit()
+    if shard_map.ring_shard(owner_id) == target:
+        set_pin(owner_id, None, directory)
+    logger.info(f"Moved {moved} transactions of owner {owner_id} to shard {target}")
+    return moved
+
+
+def pin_current_locations(directory: Session) -> int:
+    """
+    Pin every owner to the shard that holds their rows.
+
+    Run this with the old shard list before deploying a new one, so users stay
+    routable until rebalance has moved them. Owners in the middle of a move keep
+    their pin, the move sets it when it is done.
+
+    Returns:
+        int: The number of owners pinned.
+    """
+    pinned = 0
+    for shard in range(len(shard_map)):
+        for owner_id in owners_on_shard(shard):
+            if is_moving(owner_id, directory):
+                logger.error(f"Owner {owner_id} is being moved, leaving their pin alone")
+                continue
+            set_pin(owner_id, shard, directory)
+            pinned += 1
+    return pinned
+
+
+def rebalance(directory: Session) -> int:
+    """
+    Move every owner whose rows are not on their hash ring shard.
+
+    Rows on a shard other than the one an owner is pinned to are left over
+    from a move whose cleanup failed. They are reported and left alone, as are
+    owners another move is working on.
+
+    Returns:
+        int: The number of owners moved.
+    """
+    moved = 0
+    for shard in range(len(shard_map)):
+        for owner_id in owners_on_shard(shard):
+            target = shard_map.ring_shard(owner_id)
+            if target == shard:
+                continue
+            pinned = shard_map.get_pin(owner_id, directory)
+            if pinned is not None and pinned != shard:
+                logger.error(f"Owner {owner_id} is pinned to shard {pinned}, "
+                             f"leaving stale rows on shard {shard}")
+                continue
+            try:
+                move_user(owner_id, target, directory, source=shard)
+                moved += 1
+            except MoveBlocked as e:
+                logger.error(f"Skipping owner {owner_id}, run rebalance again later: {e}")
+    for pin in directory.query(ShardPin).filter(ShardPin.moving.is_(False)).all():
+        if shard_map.ring_shard(pin.owner_id) == pin.shard:
+            directory.delete(pin)
+    directory.commit()
+    return moved
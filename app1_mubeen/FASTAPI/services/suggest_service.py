@@ -0,0 +1,213 @@
+"""
+Module for per-user category and description autocomplete.
+
+Imports:
+    - bisect, heapq, re: Sorted term lookup, ranking and description tokenizing.
+    - OrderedDict, Counter: The bounded LRU of users and the term frequencies.
+    - Session: SQLAlchemy session, used only to build a user's index on a miss.
+    - transaction_model: SQLAlchemy model of the transactions table.
+
+Usage:
+    suggest answers type-ahead from memory. A user's index is built from their
+    transactions the first time it is needed and then kept current by
+    transaction_service, which calls add_transaction, remove_transaction and
+    update_transaction after every write. The index is per process, so entries
+    are rebuilt after INDEX_TTL_SECONDS to pick up writes made by other web
+    workers or by background jobs.
+"""
+import bisect
+import heapq
+import re
+from itertools import takewhile
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+from pydantic import UUID4
+from sqlalchemy.orm import Session
+from models import transaction_model
+
+# users kept in memory, least recently used are evicted first
+MAX_INDEXED_USERS = 1024
+INDEX_TTL_SECONDS = 300
+# rebuilds after a write raced with building an index, before giving up on caching it
+MAX_BUILD_ATTEMPTS = 3
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class TermIndex:
+    """
+    Sorted, case insensitive set of terms with frequencies for prefix lookup.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.counts = Counter()
+        self.display = {}
+
+    def add(self, term: str) -> None:
+        key = term.lower()
+        if not self.counts[key]:
+            bisect.insort(self.keys, key)
+            self.display[key] = term
+        self.counts[key] += 1
+
+    def remove(self, term: str) -> None:
+        key = term.lower()
+        if self.counts[key] <= 1:
+            if key in self.display:
+                del self.keys[bisect.bisect_left(self.keys, key)]
+                del self.display[key]
+            self.counts.pop(key, None)
+            return
+        self.counts[key] -= 1
+
+    def suggest(self, prefix: str, limit: int) -> list[str]:
+        """
+        Return up to limit terms starting with prefix, most frequent first.
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        # keys starting with prefix are contiguous from start, whatever their next character
+        matches = takewhile(lambda key: key.startswith(prefix),
+                            (self.keys[i] for i in range(start, len(self.keys))))
+        best = heapq.nsmallest(limit, matches, key=lambda key: (-self.counts[key], key))
+        return [self.display[key] for key in best]
+
+
+class UserIndex:
+    """
+    A user's category and description token indexes.
+    """
+
+    def __init__(self):
+        self.categories = TermIndex()
+        self.descriptions = TermIndex()
+        self.built_at = time.monotonic()
+
+    def add(self, category: Optional[str], description: Optional[str]) -> None:
+        if category:
+            self.categories.add(category)
+        for token in TOKEN_PATTERN.findall(description or ""):
+            self.descriptions.add(token)
+
+    def remove(self, category: Optional[str], description: Optional[str]) -> None:
+        if category:
+            self.categories.remove(category)
+        for token in TOKEN_PATTERN.findall(description or ""):
+            self.descriptions.remove(token)
+
+
+_indexes = OrderedDict()
+# owner -> {build token: written}, marks builds that a write happened during
+_building = {}
+_lock = threading.Lock()
+
+
+def _cached_index(owner_id: UUID4) -> Optional[UserIndex]:
+    index = _indexes.get(owner_id)
+    if index is None or time.monotonic() - index.built_at > INDEX_TTL_SECONDS:
+        _indexes.pop(owner_id, None)
+        return None
+    _indexes.move_to_end(owner_id)
+    return index
+
+
+def _mark_written(owner_id: UUID4) -> None:
+    builds = _building.get(owner_id)
+    if builds:
+        for token in builds:
+            builds[token] = True
+
+
+def get_index(owner_id: UUID4, db: Session) -> UserIndex:
+    """
+    Return the user's index, building it from the transactions table on a miss.
+
+    A write for the user while the index is being built may be missing from
+    the rows read, so such a build is thrown away and done again. If writes
+    keep racing, the last build is returned without being cached.
+    """
+    for _ in range(MAX_BUILD_ATTEMPTS):
+        token = object()
+        with _lock:
+            index = _cached_index(owner_id)
+            if index is not None:
+                return index
+            _building.setdefault(owner_id, {})[token] = False
+        try:
+            index = UserIndex()
+            rows = db.query(transaction_model.Transaction.category,
+                            transaction_model.Transaction.description).filter(
+                transaction_model.Transaction.owner_id == owner_id)
+            for category, description in rows:
+                index.add(category, description)
+        finally:
+            with _lock:
+                builds = _building[owner_id]
+                written = builds.pop(token)
+                if not builds:
+                    del _building[owner_id]
+        if written:
+            continue
+        with _lock:
+            _indexes[owner_id] = index
+            while len(_indexes) > MAX_INDEXED_USERS:
+                _indexes.popitem(last=False)
+        return index
+    return index
+
+
+def suggest(owner_id: UUID4, prefix: str, db: Session, limit: int = 10) -> dict:
+    """
+    Suggest categories and description words starting with prefix.
+
+    Args:
+        owner_id (UUID4): The user to suggest for.
+        prefix (str): What the user has typed so far.
+        db (Session): Session on the user's shard, only used on a cache miss.
+        limit (int): Maximum number of suggestions of each kind.
+
+    Returns:
+        dict: Matching categories and description words, most frequent first.
+    """
+    index = get_index(owner_id, db)
+    with _lock:
+        return {
+            "categories": index.categories.suggest(prefix, limit),
+            "descriptions": index.descriptions.suggest(prefix, limit),
+        }
+
+
+def add_transaction(owner_id: UUID4, category: Optional[str], description: Optional[str]) -> None:
+    """
+    Count a created transaction in the user's index, if it is loaded.
+    """
+    with _lock:
+        _mark_written(owner_id)
+        index = _cached_index(owner_id)
+        if index is not None:
+            index.add(category, description)
+
+
+def remove_transaction(owner_id: UUID4, category: Optional[str], description: Optional[str]) -> None:
+    """
+    Remove a deleted transaction from the user's index, if it is loaded.
+    """
+    with _lock:
+        _mark_written(owner_id)
+        index = _cached_index(owner_id)
+        if index is not None:
+            index.remove(category, description)
+
+
+def update_transaction(owner_id: UUID4, old: tuple, new: tuple) -> None:
+    """
+    Replace a transaction's old (category, description) with the new one.
+    """
+    with _lock:
+        _mark_written(owner_id)
+        index = _cached_index(owner_id)
+        if index is not None:
+            index.remove(*old)
+            index.add(*new)
@@ -16,7 +16,7 @@ Usage:
     FastAPI exceptions for error handling, transaction schemas for data validation,
     SQLAlchemy models for database interaction, and constants for error messages.
 """
-from typing import Optional
+from typing import Callable, Optional
 import schemas.transaction_schema as schemas
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
@@ -25,17 +25,71 @@ from pydantic import UUID4
 from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlalchemy import paginate
 from models import transaction_model
+from services import suggest_service
 from utils.constants import ErrorMessages
 from utils.config import get_logger
 
 logger = get_logger()
 
+#fields that can be selected with the fields= parameter
+TRANSACTION_FIELDS = tuple(schemas.Transaction.model_fields)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[list[str]]:
+    """
+    Parse a comma separated fields= parameter.
+
+    Args:
+        fields (Optional[str]): The requested fields, e.g. "table_name_id,amount".
+
+    Returns:
+        Optional[list[str]]: The field names in order without duplicates, or None for all fields.
+
+    Raises:
+        HTTPException: Raised with status code 400 if a field does not exist.
+    """
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    if not names:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=ErrorMessages.NO_FIELDS.value)
+    unknown = [name for name in names if name not in TRANSACTION_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"{ErrorMessages.INVALID_FIELDS.value}: {', '.join(unknown)}")
+    return names
+
+
+def transaction_columns(fields: list[str]) -> list:
+    """
+    Map field names to the transaction table columns to select.
+    """
+    return [getattr(transaction_model.Transaction, name) for name in fields]
+
+
+def filter_transactions(query, search: Optional[str] = None, user_id: Optional[UUID4] = None):
+    """
+    Narrow a transactions query to a user and to rows matching a search term.
+    """
+    if user_id:
+        query = query.filter(transaction_model.Transaction.owner_id == user_id)
+    if search:
+        search = search.lower()
+        query = query.filter(
+            transaction_model.Transaction.category.ilike(f"%{search}%")|
+            transaction_model.Transaction.description.ilike(f"%{search}%")|
+            transaction_model.Transaction.date.ilike(f"%{search}%")
+        )
+    return query
+
 def get_filtered_transactions_with_sum(
     db: Session, 
     search: Optional[str] = None, 
     page: int = 1, 
     size: int = 9,
-    user_id: Optional[UUID4] = None  # Add this line to accept user_id
+    user_id: Optional[UUID4] = None,  # Add this line to accept user_id
+    fields: Optional[list[str]] = None
 ) -> dict:
     """
     Retrieve transactions from the database based on filtering criteria and their total sum.
@@ -46,35 +100,29 @@ def get_filtered_transactions_with_sum(
         page (int): The current page number.
         size (int): The number of items per page.
         user_id (Optional[UUID4]): The user ID to filter transactions by user.
+        fields (Optional[list[str]]): Columns to select, all columns when None.
 
     Returns:
         dict: A dictionary with a list of transactions and their total sum.
     """
     try:
-        query = db.query(transaction_model.Transaction)
-        
-        if user_id:
-            query = query.filter(transaction_model.Transaction.owner_id == user_id)
-        
-        if search:
-            search = search.lower()
-            query = query.filter(
-                transaction_model.Transaction.category.ilike(f"%{search}%")|
-                transaction_model.Transaction.description.ilike(f"%{search}%")|
-                transaction_model.Transaction.date.ilike(f"%{search}%")
-            )
+        query = filter_transactions(db.query(transaction_model.Transaction), search, user_id)
         
-        total_amount = db.query(func.sum(transaction_model.Transaction.amount)).filter(
-            (transaction_model.Transaction.owner_id == user_id) &
-            (transaction_model.Transaction.category.ilike(f"%{search}%")|
-            transaction_model.Transaction.description.ilike(f"%{search}%")|
-            transaction_model.Transaction.date.ilike(f"%{search}%"))
-        ).scalar() or 0
+        #same filters as the page query, without a search term every row counts
+        total_amount = query.with_entities(
+            func.sum(transaction_model.Transaction.amount)).scalar() or 0
         
+        if fields:
+            query = query.with_entities(*transaction_columns(fields))
+
         transactions_page = paginate(query, Params(page=page, size=size))
+        items = transactions_page.items
+        if fields:
+            #a single selected column comes back from paginate as plain values, not rows
+            items = [dict(zip(fields, row if len(fields) > 1 else (row,))) for row in items]
         
         return {
-            "transactions": transactions_page.items,
+            "transactions": items,
             "total_amount": total_amount,
             "total": transactions_page.total,
             "page": transactions_page.page,
@@ -87,37 +135,48 @@ def get_filtered_transactions_with_sum(
 
 
 #keeping code clean by using DRY principle 
-def fetch_transaction_id(transaction_id: UUID4, db: Session) -> transaction_model.Transaction:
+def fetch_transaction_id(transaction_id: UUID4, db: Session, owner_id: UUID4,
+                         fields: Optional[list[str]] = None) -> transaction_model.Transaction:
     """
-    Fetch a transaction from the database by its ID.
+    Fetch one of the owner's transactions from the database by its ID.
 
     Args:
         transaction_id (UUID4): The UUID4 ID of the transaction to fetch.
         db (Session): The database session.
+        owner_id (UUID4): The user the transaction must belong to.
+        fields (Optional[list[str]]): Columns to select, all columns when None.
 
     Returns:
-        models.Transaction: The transaction object corresponding to the given ID.
+        models.Transaction: The transaction object corresponding to the given ID,
+        or a dict of the selected columns when fields is given.
 
     Raises:
         HTTPException: Raised with status code 404 if the 
         transaction with the specified ID is not found.
     """
-    db_transaction = db.query(transaction_model.Transaction).filter(
-        transaction_model.Transaction.table_name_id == transaction_id).first()
+    query = db.query(transaction_model.Transaction)
+    if fields:
+        query = query.with_entities(*transaction_columns(fields))
+    db_transaction = query.filter(
+        transaction_model.Transaction.table_name_id == transaction_id,
+        transaction_model.Transaction.owner_id == owner_id).first()
     if not db_transaction:
         logger.error(f"Transaction with ID: {transaction_id} not found")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, 
-                            detail=ErrorMessages.TRANSACTION_NOT_FOUND)
-    return db_transaction
+                            detail=ErrorMessages.TRANSACTION_NOT_FOUND.value)
+    return dict(db_transaction._mapping) if fields else db_transaction
 
 
-def get_transaction_by_id(transaction_id: UUID4, db: Session) -> transaction_model.Transaction:
+def get_transaction_by_id(transaction_id: UUID4, db: Session, owner_id: UUID4,
+                          fields: Optional[list[str]] = None) -> transaction_model.Transaction:
     """
     Retrieve a specific transaction from the database by its ID.
 
     Args:
         transaction_id (UUID4): The UUID4 ID of the transaction to retrieve.
         db (Session): The database session.
+        owner_id (UUID4): The user the transaction must belong to.
+        fields (Optional[list[str]]): Columns to select, all columns when None.
 
     Returns:
         models.Transaction: The transaction object corresponding to the given ID.
@@ -127,19 +186,21 @@ def get_transaction_by_id(transaction_id: UUID4, db: Session) -> transaction_mod
         transaction with the specified ID is not found.
     """
     try:
-        db_transaction = fetch_transaction_id(transaction_id, db)
+        db_transaction = fetch_transaction_id(transaction_id, db, owner_id, fields)
         if not db_transaction:
             logger.error(f"Transaction with ID: {transaction_id} not found")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, 
-                                detail=ErrorMessages.TRANSACTION_NOT_FOUND)
+                                detail=ErrorMessages.TRANSACTION_NOT_FOUND.value)
         logger.info(f"Transaction retrieved successfully with ID: {transaction_id}")
         return db_transaction
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving transaction: {e}")
-        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_RETRIEVING_TRANSACTION)from e
+        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_RETRIEVING_TRANSACTION.value)from e
     
 def update_transaction(transaction_id: UUID4, 
-            transaction: schemas.TransactionBase, db: Session) -> transaction_model.Transaction:
+            transaction: schemas.TransactionBase, db: Session, owner_id: UUID4) -> transaction_model.Transaction:
     """
     Update an existing transaction in the database.
 
@@ -147,6 +208,7 @@ def update_transaction(transaction_id: UUID4,
         transaction_id (UUID4): The ID of the transaction to update.
         transaction (schemas.TransactionBase): The updated transaction data.
         db (Session): The database session.
+        owner_id (UUID4): The user the transaction must belong to.
 
     Returns:
         models.Transaction: The updated transaction object.
@@ -155,20 +217,25 @@ def update_transaction(transaction_id: UUID4,
         HTTPException: Raised if the transaction with the given ID is not found.
     """
     try:
-        db_transaction = fetch_transaction_id(transaction_id, db)
+        db_transaction = fetch_transaction_id(transaction_id, db, owner_id)
         if not db_transaction:
             logger.error(f"Transaction with ID: {transaction_id} not found")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                detail=ErrorMessages.TRANSACTION_NOT_FOUND)
+                                detail=ErrorMessages.TRANSACTION_NOT_FOUND.value)
+        old_terms = (db_transaction.category, db_transaction.description)
         for field, value in transaction.dict(exclude_unset=True).items():
             setattr(db_transaction, field, value)
         db.commit()
         db.refresh(db_transaction)
+        suggest_service.update_transaction(db_transaction.owner_id, old_terms,
+                                           (db_transaction.category, db_transaction.description))
         logger.info(f"Transaction updated successfully with ID: {transaction_id}")
         return db_transaction
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating transaction: {e}")
-        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_UPDATING_TRANSACTION)from e
+        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_UPDATING_TRANSACTION.value)from e
 
 
 def create_transaction(transaction: schemas.TransactionCreate, owner_id: UUID4, db: Session) -> transaction_model.Transaction:
@@ -182,35 +249,118 @@ def create_transaction(transaction: schemas.TransactionCreate, owner_id: UUID4,
         db.add(db_transaction)
         db.commit()
         db.refresh(db_transaction)
+        suggest_service.add_transaction(owner_id, db_transaction.category, db_transaction.description)
         logger.info(f"Transaction created successfully with ID: {db_transaction.table_name_id}")
         return db_transaction
     except Exception as e:
         logger.error(f"Error creating transaction: {e}")
-        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_CREATING_TRANSACTION) from e
+        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_CREATING_TRANSACTION.value) from e
 
 
 
-def delete_transaction(transaction_id: UUID4, db: Session) -> None:
+def create_transactions(transactions: list[schemas.TransactionCreate], owner_id: UUID4, db: Session,
+                        report: Optional[Callable] = None, chunk_size: int = 500,
+                        before_commit: Optional[Callable] = None) -> int:
+    """
+    Create many transactions in a single database transaction.
+
+    Rows are added in chunks and written by a single commit at the end, so a
+    failure or cancellation part way through leaves nothing behind and the
+    import can be retried from the start. Nothing is written before that commit,
+    so report can update other tables on the same database without waiting on
+    an open write.
+
+    Args:
+        transactions (list[schemas.TransactionCreate]): The transactions to create.
+        owner_id (UUID4): The user the transactions belong to.
+        db (Session): The database session.
+        report (Optional[Callable]): Called with the fraction done after each chunk.
+        chunk_size (int): Number of rows added between reports.
+        before_commit (Optional[Callable]): Called right before committing, raises to abort.
+
+    Returns:
+        int: The number of transactions created.
+    """
+    try:
+        for start in range(0, len(transactions), chunk_size):
+            chunk = transactions[start:start + chunk_size]
+            db.add_all(transaction_model.Transaction(**transaction.dict(), owner_id=owner_id)
+                       for transaction in chunk)
+            if report:
+                report((start + len(chunk)) / len(transactions))
+        if before_commit:
+            before_commit()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for transaction in transactions:
+        suggest_service.add_transaction(owner_id, transaction.category, transaction.description)
+    logger.info(f"Created {len(transactions)} transactions for owner: {owner_id}")
+    return len(transactions)
+
+
+def recategorize_transactions(owner_id: UUID4, category: str, new_category: str, db: Session,
+                              before_commit: Optional[Callable] = None) -> int:
+    """
+    Move all of a user's transactions in a category to a new category.
+
+    The rows are changed by a single UPDATE in one database transaction, so a
+    failure or cancellation before the commit leaves every row as it was.
+
+    Args:
+        owner_id (UUID4): The user whose transactions are changed.
+        category (str): The category to rename.
+        new_category (str): The category the transactions are moved to.
+        db (Session): The database session.
+        before_commit (Optional[Callable]): Called right before committing, raises to abort.
+
+    Returns:
+        int: The number of transactions updated.
+    """
+    query = db.query(transaction_model.Transaction).filter(
+        transaction_model.Transaction.owner_id == owner_id,
+        transaction_model.Transaction.category == category)
+    try:
+        rows = query.with_entities(transaction_model.Transaction.description).with_for_update().all()
+        query.update({transaction_model.Transaction.category: new_category}, synchronize_session=False)
+        if before_commit:
+            before_commit()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for description, in rows:
+        suggest_service.update_transaction(owner_id, (category, description), (new_category, description))
+    logger.info(f"Moved {len(rows)} transactions from {category} to {new_category} for owner: {owner_id}")
+    return len(rows)
+
+
+def delete_transaction(transaction_id: UUID4, db: Session, owner_id: UUID4) -> None:
     """
     Delete a transaction from the database by its ID.
 
     Args:
         transaction_id (UUID4): The ID of the transaction to delete.
         db (Session): The database session.
+        owner_id (UUID4): The user the transaction must belong to.
 
     Raises:
         HTTPException: Raised if the transaction with the given ID is not found.
     """
     try:
-        db_transaction = db.query(transaction_model.Transaction).filter(
-            transaction_model.Transaction.table_name_id == transaction_id).first()
+        db_transaction = fetch_transaction_id(transaction_id, db, owner_id)
         if not db_transaction:
             logger.error(f"Transaction with ID: {transaction_id} not found")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                detail=ErrorMessages.TRANSACTION_NOT_FOUND)
+                                detail=ErrorMessages.TRANSACTION_NOT_FOUND.value)
         db.delete(db_transaction)
         db.commit()
+        suggest_service.remove_transaction(db_transaction.owner_id, db_transaction.category,
+                                           db_transaction.description)
         logger.info(f"Transaction deleted successfully with ID: {transaction_id}")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting transaction: {e}")
-        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_DELETING_TRANSACTION)from e
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=ErrorMessages.ERROR_DELETING_TRANSACTION.value)from e
\ No newline at end of file
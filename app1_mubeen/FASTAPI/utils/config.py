@@ -43,7 +43,12 @@ class Config:
 
     def setup_database(self):
         """
-        Setup database connection and engine.
+        Setup database connection and engines.
+
+        DATABASE_URL is the primary database. It holds the users table and the
+        shard directory. SHARD_DATABASE_URLS is an optional comma separated list
+        of databases that transactions are spread across by owner_id. When it is
+        not set the primary database is the only shard.
         """
         database_url = os.getenv("DATABASE_URL")
         if database_url is None:
@@ -51,4 +56,10 @@ class Config:
 
         self.engine = create_engine(database_url, echo=True)
 
+        shard_urls = [url.strip() for url in os.getenv("SHARD_DATABASE_URLS", "").split(",") if url.strip()]
+        self.shard_engines = [
+            self.engine if url == database_url else create_engine(url, echo=True)
+            for url in shard_urls
+        ] or [self.engine]
+
 config = Config()
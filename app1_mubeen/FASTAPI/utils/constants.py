@@ -22,4 +22,30 @@ class ErrorMessages(Enum):
     ERROR_RETRIEVING_TRANSACTION = "Error retrieving transactions"
     ERROR_CREATING_TRANSACTION = "Error creating transaction"
     ERROR_UPDATING_TRANSACTION = "Error updating transaction"
-    ERROR_DELETING_TRANSACTION = "Error deleting transaction"
\ No newline at end of file
+    ERROR_DELETING_TRANSACTION = "Error deleting transaction"
+    JOB_NOT_FOUND = "Job not Found"
+    UNKNOWN_JOB_KIND = "Unknown job kind"
+    JOB_NOT_CANCELLABLE = "Job has already finished"
+    ERROR_ENQUEUEING_JOB = "Error enqueueing job"
+    INVALID_JOB_PAYLOAD = "Invalid job payload"
+    INVALID_FIELDS = "Unknown fields requested"
+    NO_FIELDS = "No fields requested"
+    SHARD_MOVING = "Transactions are being moved, try again shortly"
+
+
+class JobStatus(Enum):
+    """
+    Enumeration for the states of a background job.
+
+    Attributes:
+        QUEUED (str): Waiting for a worker, also used for jobs waiting to be retried.
+        RUNNING (str): Claimed by a worker.
+        SUCCEEDED (str): Finished, the result is stored on the job.
+        FAILED (str): Ran out of attempts, the last error is stored on the job.
+        CANCELLED (str): Cancelled by the user before it finished.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
@@ -0,0 +1,89 @@
+"""
+Entry point for the background job worker.
+
+Claims queued jobs from the jobs table and runs them on a local process pool,
+so heavy per-user work never runs inside a web request.
+
+Usage:
+    python worker.py --processes 4 --poll-interval 1.0
+
+    Several workers can run against the same PostgreSQL database, claimed rows
+    are locked with SKIP LOCKED so a job only runs once per attempt. Jobs whose
+    worker died are handed back to the queue once their heartbeat goes stale,
+    and an attempt that lost its job that way can no longer commit its work.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from models.database import SessionLocal, Base, engine
+from models.sharding import shard_map
+from services import job_service
+from utils.config import get_logger
+
+logger = get_logger()
+
+
+def init_process() -> None:
+    """
+    Drop connections inherited from the parent, each process opens its own.
+    """
+    engine.dispose(close=False)
+    for shard_engine in shard_map.engines:
+        shard_engine.dispose(close=False)
+
+
+def main() -> None:
+    """
+    Poll the queue and keep the process pool busy until interrupted.
+    """
+    parser = argparse.ArgumentParser(description="Run queued background jobs")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    logger.info(f"Worker started with {args.processes} processes")
+
+    pool = ProcessPoolExecutor(max_workers=args.processes, initializer=init_process)
+    running = set()
+    try:
+        while True:
+            broken = False
+            with SessionLocal() as db:
+                job_service.requeue_stale_jobs(db)
+                while len(running) < args.processes:
+                    claimed = job_service.claim_job(db)
+                    if claimed is None:
+                        break
+                    try:
+                        running.add(pool.submit(job_service.run_job, *claimed))
+                    except BrokenProcessPool:
+                        # the claimed job is requeued once its lease expires
+                        broken = True
+                        break
+            if running and not broken:
+                done, running = wait(running, timeout=args.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    if isinstance(error, BrokenProcessPool):
+                        broken = True
+                    elif error:
+                        logger.error(f"Worker process error: {error}")
+            elif not running:
+                time.sleep(args.poll_interval)
+            if broken:
+                # a process died, its jobs are requeued when their leases expire
+                logger.error("Process pool broken, starting a new one")
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(max_workers=args.processes, initializer=init_process)
+                running = set()
+    except KeyboardInterrupt:
+        logger.info("Worker shutting down, waiting for running jobs")
+    finally:
+        pool.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    main()
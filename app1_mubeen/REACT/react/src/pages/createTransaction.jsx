@@ -2,6 +2,9 @@ import { useState, useEffect } from 'react';
 import { useNavigate, BrowserRouter as Router, Route, Routes, Link } from 'react-router-dom';
 import api from '../api';
 import Swal from 'sweetalert2';
+import axios from 'axios';
+
+const SUGGEST_DEBOUNCE_MS = 200;
 
 function CreateTransaction() {
     const [transactions, setTransactions] = useState([]);
@@ -12,9 +15,35 @@ function CreateTransaction() {
         is_income: false,
         date: ''
     });
+    const [categorySuggestions, setCategorySuggestions] = useState([]);
 
     const navigate = useNavigate();
 
+    useEffect(() => {
+        if (!formData.category) {
+            setCategorySuggestions([]);
+            return;
+        }
+        // wait for a pause in typing, and drop responses for an older prefix
+        const controller = new AbortController();
+        const timer = setTimeout(() => {
+            api.get('/transactions/suggest', {
+                params: { prefix: formData.category },
+                signal: controller.signal,
+            })
+                .then((response) => setCategorySuggestions(response.data.categories))
+                .catch((error) => {
+                    if (!axios.isCancel(error)) {
+                        console.error('Error fetching suggestions:', error);
+                    }
+                });
+        }, SUGGEST_DEBOUNCE_MS);
+        return () => {
+            clearTimeout(timer);
+            controller.abort();
+        };
+    }, [formData.category]);
+
     const handleInputChange = (event) => {
         const value = event.target.type === 'checkbox' ? event.target.checked : event.target.value;
         setFormData({
@@ -108,8 +137,14 @@ function CreateTransaction() {
                                         onChange={handleInputChange}
                                         value={formData.category}
                                         placeholder="Enter the category" 
+                                        list="category-suggestions"
                                         required
                                     />
+                                    <datalist id="category-suggestions">
+                                        {categorySuggestions.map((category) => (
+                                            <option key={category} value={category} />
+                                        ))}
+                                    </datalist>
                                 </div>
                                 <div className="mb-3">
                                     <label htmlFor="description" className="form-label">Description</label>